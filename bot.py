@@ -42,6 +42,9 @@ in a cohesive unit toward the enemy hill. Momentum is also important as
 ants in motion are less likely to be killed and can explore/pick up food.
 """
 
+import numpy as np
+from numba import njit
+
 from ants import *
 
 # from ants.py
@@ -75,41 +78,331 @@ number_of_influences = {
     MY_HILL: 4
 }
 
+# influence below this barely changes which tile an ant picks, so an item's
+# influence stops spreading once strength / (dist + 1) falls under it
+min_influence = 0.25
+
+# how far (in tiles) each item's influence spreads
+# (vision edges are not capped: they sit just past the view distance of the
+# ant that creates them, so that ant is always far out on the falloff)
+max_distance = {
+    tile: int(influence_values[tile] / min_influence) - 1
+    for tile in (FOOD, ENEMY_HILL, WAVE)
+}
+
 stop_propagation = [WATER]
-stop_locs = set()
 
 blocked = [FOOD, WATER]
 
+
+def tile_lut(values, default=0, dtype=np.float64):
+    """Dense lookup table indexed by tile code (tile codes fit in int8)
+    """
+    lut = np.full(256, default, dtype=dtype)
+    for tile, value in values.items():
+        lut[tile] = value
+        
+    return lut
+
+
+# lookup table versions of the above, indexed directly with the ants map
+influence_values_lut = tile_lut(influence_values)
+number_of_influences_lut = tile_lut(number_of_influences, -1, np.int64) # -1: no limit
+max_distance_lut = tile_lut(max_distance, -1, np.int64) # -1: no limit
+stop_propagation_lut = tile_lut(dict.fromkeys(stop_propagation, True), False, bool)
+blocked_lut = tile_lut(dict.fromkeys(blocked, True), False, bool)
+
 nrows = 0
 ncols = 0
 
-def wrap_loc(loc):
-    """Wrap location around map
+# neighbour order used by the influence BFS
+bfs_directions = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+# directions an ant can be ordered in, and their deltas
+order_directions = ('n', 's', 'e', 'w', 'stay')
+order_deltas = ((-1, 0), (1, 0), (0, 1), (0, -1), (0, 0))
+STAY = 4
+
+def pack(r, c):
+    """Linear key of location (r, c), for ints or arrays
+    """
+    return r * ncols + c
+
+
+def unpack(key):
+    """Location (r, c) of a linear key, for ints or arrays
+    """
+    return divmod(key, ncols)
+
+
+def diamond_offsets(distance, true_distance=False, edge=False):
+    """Row/col offsets (2 x K array) of all locations within distance of
+    the origin, or only those exactly distance away if edge
+    """
+    dr, dc = np.mgrid[-distance:distance + 1, -distance:distance + 1]
+    dist = np.abs(dr) + np.abs(dc)
+    
+    if edge:
+        keep = dist == distance
+    else:
+        keep = dist <= (distance + 1 if true_distance else distance)
+        
+    return np.array([dr[keep], dc[keep]], dtype=np.int32)
+
+
+@njit(cache=True)
+def spread_influence(src_r, src_c, strengths, max_ants, max_dist, stop_mask, ant_mask, imap):
+    """Breadth-first search from every influence source at once
+    
+    All sources share one queue. Each entry is tagged with its source, so
+    visited tiles and ant counts are kept per source, and strength / (dist + 1)
+    is added to imap as each tile is reached. If maximum number of ants is
+    reached for a source, or its maximum distance, stop its propagation.
+    
+    Tiles are referred to by a single int key, r * cols + c.
+    """
+    rows, cols = stop_mask.shape
+    nsrc = src_r.shape[0]
+    ncells = rows * cols
+    
+    # keys of the wrapped neighbours of each tile, in bfs_directions order
+    neighbours = np.empty((ncells, 4), dtype=np.int32)
+    for r in range(rows):
+        for c in range(cols):
+            for k, (dr, dc) in enumerate(bfs_directions):
+                neighbours[r * cols + c, k] = (r + dr) % rows * cols + (c + dc) % cols
+                
+    stop = stop_mask.reshape(-1)
+    ant = ant_mask.reshape(-1)
+    influence = imap.reshape(-1)
+    
+    # one visited bit per source per tile, packed into 64 bit words
+    visited = np.zeros((ncells, (nsrc + 63) // 64), dtype=np.uint64)
+    num_ants = np.zeros(nsrc, dtype=np.int64)
+    dead = np.zeros(nsrc, dtype=np.uint8)
+    
+    size = max(64, 4 * nsrc * (rows + cols))
+    q_key = np.empty(size, dtype=np.int32)
+    q_src = np.empty(size, dtype=np.int32)
+    q_dist = np.empty(size, dtype=np.int32)
+    head = 0
+    tail = 0
+    
+    for s in range(nsrc):
+        key = src_r[s] * cols + src_c[s]
+        visited[key, s >> 6] |= np.uint64(1) << np.uint64(s & 63)
+        influence[key] += strengths[s]
+        q_key[tail] = key
+        q_src[tail] = s
+        q_dist[tail] = 0
+        tail += 1
+        
+    while head < tail:
+        s = q_src[head]
+        key = q_key[head]
+        dist = q_dist[head] + 1
+        head += 1
+        
+        if dead[s] or dist > max_dist[s]:
+            continue
+            
+        word = s >> 6
+        bit = np.uint64(1) << np.uint64(s & 63)
+        
+        for k in range(4):
+            add = neighbours[key, k]
+            
+            if ant[add]:
+                num_ants[s] += 1
+                
+                if num_ants[s] >= max_ants[s]:
+                    dead[s] = 1
+                    break
+                    
+            if stop[add] or visited[add, word] & bit:
+                continue
+                
+            visited[add, word] |= bit
+            influence[add] += strengths[s] / (dist + 1)
+            
+            # queue is full, drop popped entries and grow if still mostly live
+            if tail == size:
+                live = tail - head
+                if 2 * live > size:
+                    size *= 2
+                    
+                q_key = np.concatenate((q_key[head:tail], np.empty(size - live, dtype=np.int32)))
+                q_src = np.concatenate((q_src[head:tail], np.empty(size - live, dtype=np.int32)))
+                q_dist = np.concatenate((q_dist[head:tail], np.empty(size - live, dtype=np.int32)))
+                head = 0
+                tail = live
+                
+            q_key[tail] = add
+            q_src[tail] = s
+            q_dist[tail] = dist
+            tail += 1
+
+
+@njit(cache=True)
+def ranks_before(scores, i, j):
+    """Whether direction i ranks ahead of direction j (ties go to the later direction)
+    """
+    return scores[i] > scores[j] or (scores[i] == scores[j] and i > j)
+
+
+@njit(cache=True)
+def top_k_of_5(scores, k):
+    """Index of the k-th best of five scores, best first
+    
+    Sorted with a fixed 9 comparator network rather than a full sort.
+    """
+    i0, i1, i2, i3, i4 = 0, 1, 2, 3, 4
+    
+    if ranks_before(scores, i3, i0): i0, i3 = i3, i0
+    if ranks_before(scores, i4, i1): i1, i4 = i4, i1
+    if ranks_before(scores, i2, i0): i0, i2 = i2, i0
+    if ranks_before(scores, i3, i1): i1, i3 = i3, i1
+    if ranks_before(scores, i1, i0): i0, i1 = i1, i0
+    if ranks_before(scores, i4, i2): i2, i4 = i4, i2
+    if ranks_before(scores, i2, i1): i1, i2 = i2, i1
+    if ranks_before(scores, i4, i3): i3, i4 = i4, i3
+    if ranks_before(scores, i3, i2): i2, i3 = i3, i2
+    
+    return (i0, i1, i2, i3, i4)[k]
+
+
+@njit(cache=True)
+def order_ants(mmap, ant_keys, rows, cols):
+    """Loop through queue of ants, removing them if they have a valid space to move into.
+    
+    mmap is flattened and ants are given as tile keys (see pack). Returns the
+    chosen direction (index into order_directions) for each ant, -1 if it is
+    not moving, and the ants in the order their orders were issued.
+    """
+    nants = ant_keys.shape[0]
+    
+    # ring buffer of ant indices still to move, -1 is the level marker
+    capacity = nants + 1
+    queue = np.empty(capacity, dtype=np.int32)
+    head = 0
+    size = 0
+    marker_queued = False
+    
+    # tiles with an ant in the queue, and tiles already chosen as destinations
+    pending = np.zeros(rows * cols, dtype=np.uint8)
+    prev_destinations = np.zeros(rows * cols, dtype=np.uint8)
+    
+    moves = np.full(nants, -1, dtype=np.int8)
+    issued = np.empty(nants, dtype=np.int32)
+    num_issued = 0
+    scores = np.empty(5, dtype=mmap.dtype)
+    dests = np.empty(5, dtype=np.int64)
+    
+    for i in range(nants):
+        queue[size] = i
+        size += 1
+        pending[ant_keys[i]] = 1
+        
+    level = 0
+    turns_without_order = 0
+    
+    while size:
+        i = queue[head]
+        head = (head + 1) % capacity
+        size -= 1
+        
+        if i < 0:
+            marker_queued = False
+        else:
+            key = ant_keys[i]
+            pending[key] = 0
+            
+        # look for marker in queue, if so the following ants will choose their next best spot
+        # also check if too many turns have passed without issuing an order (this typically
+        # happens if ants want to move into each other's space)
+        if i < 0 or turns_without_order >= size + 1:
+            level += 1
+            if level > 4:
+                break
+            else:
+                continue
+                
+        # pick the level-th best score, current loc included
+        r, c = divmod(key, cols)
+        for d in range(5):
+            dests[d] = (r + order_deltas[d][0]) % rows * cols + (c + order_deltas[d][1]) % cols
+            scores[d] = mmap[dests[d]]
+        d = top_k_of_5(scores, level)
+        
+        # highest influence is current spot
+        if d == STAY:
+            prev_destinations[key] = 1
+            continue
+            
+        move_key = dests[d]
+        
+        # if moving into a square where another ant currently is, move to back of queue
+        if pending[move_key]:
+            queue[(head + size) % capacity] = i
+            size += 1
+            pending[key] = 1
+            turns_without_order += 1
+            
+        # trying to move into a space another ant has already chosen, append marker to queue
+        elif prev_destinations[move_key]:
+            if not marker_queued:
+                queue[(head + size) % capacity] = -1
+                size += 1
+                marker_queued = True
+            queue[(head + size) % capacity] = i
+            size += 1
+            pending[key] = 1
+            
+        # go!
+        else:
+            prev_destinations[move_key] = 1
+            turns_without_order = 0
+            moves[i] = d
+            issued[num_issued] = i
+            num_issued += 1
+            
+    return moves, issued[:num_issued]
+
+
+def warm_up():
+    """Run the numba kernels once with the dtypes do_turn uses, so compiling
+    (or loading the cache) happens outside of turn time
     """
-    r, c = loc
-    return (r % nrows, c % ncols)
+    no_locs = np.zeros(0, dtype=np.int32)
+    no_limits = np.zeros(0, dtype=np.int64)
+    stop_mask = np.zeros((1, 1), dtype=bool)
+    ant_mask = np.zeros((1, 1), dtype=np.uint8)
+    imap = np.zeros((1, 1), dtype=np.float32)
+    spread_influence(no_locs, no_locs, np.zeros(0), no_limits, no_limits,
+                     stop_mask, ant_mask, imap)
+    order_ants(imap.reshape(-1), no_locs, 1, 1)
 
 
 class Wave:
     """Line of influence, that moves N/S depending on start location
     bringing a wave of ants
     """
+    moves = {
+        'n': np.array([-1, 0], dtype=np.int32),
+        's': np.array([1, 0], dtype=np.int32),
+        'e': np.array([0, 1], dtype=np.int32),
+        'w': np.array([0, -1], dtype=np.int32)
+    }
+    
     def __init__(self, left, width=4):
-        locs = [left]
-        for i in range(1, width + 1):
-            locs.append((left[0], left[1] + i))
-            
-        self.locs = locs
+        self.locs = np.stack([
+            np.full(width + 1, left[0]),
+            np.arange(left[1], left[1] + width + 1)
+        ], axis=1).astype(np.int32)
         
     def move(self, direction):
-        move = {
-            'n': (-1, 0),
-            's': (1, 0),
-            'e': (0, 1),
-            'w': (0, -1)
-        }[direction]
-        
-        self.locs = [wrap_loc((l[0] + move[0], l[1] + move[1])) for l in self.locs]
+        self.locs += self.moves[direction]
+        np.mod(self.locs, (nrows, ncols), out=self.locs)
 
 
 class IForOneWelcomeOurNewInsectOverlords:
@@ -123,21 +416,29 @@ class IForOneWelcomeOurNewInsectOverlords:
         """Set initial variables
         """
         self.view_distance = sqrt(ants.viewradius2)
-        self.visibility_map = self.map_zeros(ants.map)
         
         global nrows, ncols
-        nrows = len(self.visibility_map)
-        ncols = len(self.visibility_map[0])
-
-    def map_zeros(self, amap):
-        """Create map of zeroes the same size as given
-        """
-        zm = [0] * len(amap)
+        nrows = len(ants.map)
+        ncols = len(ants.map[0])
         
-        for i in range(len(amap)):
-            zm[i] = [0] * len(amap[0])
-            
-        return zm
+        # int16 rather than int8 so unseen tiles do not overflow in long games
+        self.visibility_map = np.zeros((nrows, ncols), dtype=np.int16)
+        self.imap = np.zeros((nrows, ncols), dtype=np.float32)
+        
+        # per-turn buffers, refilled in place every turn
+        self.amap = np.zeros((nrows, ncols), dtype=np.int8)
+        self.stop_mask = np.zeros((nrows, ncols), dtype=bool)
+        self.ant_mask = np.zeros((nrows, ncols), dtype=np.uint8)
+        
+        # offset templates for combat_map/edge_locs
+        self.diamond_offsets = {
+            (distance, true_distance): diamond_offsets(distance, true_distance)
+            for distance in (1, 2) for true_distance in (False, True)
+        }
+        self.edge_offsets = diamond_offsets(int(self.view_distance) + 1, edge=True)
+
+        # compile (or load the cache) during setup rather than on turn 1
+        warm_up()
 
     def update_visibility(self, ants):
         """Update locations that have been seen as 0,
@@ -145,49 +446,35 @@ class IForOneWelcomeOurNewInsectOverlords:
         """
         ants.visible((0, 0)) # must be called to instantiate vision map
         
-        for r, row in enumerate(ants.vision):
-            for c, visible in enumerate(row):
-                if visible:
-                    self.visibility_map[r][c] = 0
-                else:
-                    self.visibility_map[r][c] += 1
-        
-    def set_stop_locs(self, amap):
-        """Locations that stop propagation of the BFS
-        ie. water
-        """
-        for r, row in enumerate(amap):
-            for c, col in enumerate(amap[r]):
-                if col in stop_propagation:
-                    stop_locs.add((r, c))
+        vis = np.asarray(ants.vision, dtype=bool)
+        self.visibility_map[vis] = 0
+        self.visibility_map[~vis] += 1
         
     def influence_locs(self, amap):
         """Iterate over map, if tile value (hills, food, etc)
-        has influence value, add to list
+        has influence value, add to list as (loc, strength, kind)
         """
-        locs = []
-    
-        for r, row in enumerate(amap):
-            for c, col in enumerate(row):
-                if col in influence_values:
-                    locs.append(((r, c), influence_values[col]))
+        rs, cs = np.nonzero(influence_values_lut[amap] > 0)
+        tiles = amap[rs, cs]
+        strengths = influence_values_lut[tiles]
                     
-        return locs
+        return list(zip(zip(rs.tolist(), cs.tolist()), strengths.tolist(), tiles.tolist()))
         
     def add_to_map(self, amap, locs, value):
         """Add custom values to ants map
         
         ie. to differentiate between ally and enemy ants
         """
-        for r, c in locs:
-            amap[r][c] = value
+        if len(locs):
+            locs = np.asarray(locs, dtype=np.int32)
+            amap[locs[:, 0], locs[:, 1]] = value
             
         return amap
 
-    def map_influence(self, amap, locs, my_ants):
-        """Breadth-first search to create influence map. A starting point is
-        given and each subsequent move (1-tile away) is stored as a list. The
-        index of each list in the list of lists is its distance.
+    def map_influence(self, imap, amap, locs, my_ants):
+        """Breadth-first search to create influence map. Influence spreads
+        from each starting point, one tile per step, and is divided by
+        the distance travelled.
         
                             3
                           3 2 3
@@ -195,87 +482,64 @@ class IForOneWelcomeOurNewInsectOverlords:
                           3 2 3
                             3
                             
-        If maximum number of ants is reached, stop propagation.
+        If maximum number of ants is reached, or the maximum distance for
+        that kind of influence, stop propagation.
         """
-        def build_influence(start_loc):
-            influence_locs = [[start_loc]]
-            queue = [start_loc]
-            old_locs = {start_loc} # use set for improved performance
-            num_ants = 0
-            max_ants = number_of_influences.get(amap[start_loc[0]][start_loc[1]], len(my_ants))
-
-            while True:
-                new_locs = []
-                
-                for loc in queue:
-                    for direction in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-                        add = (loc[0] + direction[0], loc[1] + direction[1])
-                        add = wrap_loc(add)
-                            
-                        stop = add in stop_locs
-                        
-                        if add in my_ants:
-                            num_ants += 1
-                            
-                            if num_ants >= max_ants:
-                                influence_locs.append(new_locs)
-                                return influence_locs
-
-                        if add not in old_locs and not stop:
-                            old_locs.add(add)
-                            new_locs.append(add)
-                        
-                queue = new_locs
-                
-                if not queue:
-                    return influence_locs
-                
-                influence_locs.append(new_locs)
-
-            return influence_locs
-            
-        influences = [(build_influence(loc), strength) for loc, strength in locs]
-        return influences
+        ant_mask = self.ant_mask
+        ant_mask.fill(0)
+        ant_mask[my_ants[:, 0], my_ants[:, 1]] = 1
         
-    def add_influence(self, imap, influences):
-        """Add influence values to blank map (map of zeros)
-        """
-        for influence, strength in influences:
-            for dist, locs in enumerate(influence):
-                for loc in locs:
-                    r, c = loc
-                    val = strength / (dist + 1)
-                    imap[r][c] += val
+        src_r = np.array([loc[0] for loc, _, _ in locs], dtype=np.int32)
+        src_c = np.array([loc[1] for loc, _, _ in locs], dtype=np.int32)
+        strengths = np.array([strength for _, strength, _ in locs], dtype=np.float64)
+        kinds = np.array([kind for _, _, kind in locs], dtype=np.int8)
+        
+        max_ants = number_of_influences_lut[amap[src_r, src_c]]
+        max_ants[max_ants < 0] = len(my_ants)
+        max_dist = max_distance_lut[kinds]
+        max_dist[max_dist < 0] = nrows * ncols
+        
+        spread_influence(src_r, src_c, strengths, max_ants, max_dist, self.stop_mask, ant_mask, imap)
             
         return imap
         
-    def locs_within(self, loc, distance, true_distance=False):
-        """Get all locations within distance from loc
+    def count_within(self, locs, offsets):
+        """Count, for every tile, how many locs it is within offsets of
         """
-        locs = []
-        for r in range(loc[0] - distance, loc[0] + distance + 1):
-            for c in range(loc[1] - distance, loc[1] + distance + 1):
-                compare = distance + 1 if true_distance else distance
-                if abs(loc[0] - r) + abs(loc[1] - c) <= compare:
-                    locs.append(wrap_loc((r, c)))
-                    
-        return locs
+        count = np.zeros((nrows, ncols), dtype=np.int32)
+        
+        if len(locs):
+            dr, dc = offsets
+            np.add.at(count, ((locs[:, 0:1] + dr) % nrows, (locs[:, 1:2] + dc) % ncols), 1)
+            
+        return count
         
     def edge_locs(self, locs, ants):
         """Retrieve the edges of visibility for each ant
         """
-        distance = int(self.view_distance) + 1
-        edges = set()
-        
-        for loc in locs:
-            for r in range(loc[0] - distance, loc[0] + distance + 1):
-                for c in range(loc[1] - distance, loc[1] + distance + 1):
-                    if abs(loc[0] - r) + abs(loc[1] - c) == distance:
-                        edge_loc = wrap_loc((r, c))
-                        if self.visibility_map[edge_loc[0]][edge_loc[1]] >= 5:
-                            edges.add(edge_loc)
+        if not len(locs):
+            return []
+            
+        dr, dc = self.edge_offsets
+        rs = (locs[:, 0:1] + dr) % nrows
+        cs = (locs[:, 1:2] + dc) % ncols
+        
+        edges = np.unique(pack(rs, cs)[self.visibility_map[rs, cs] >= 5])
+        rs, cs = unpack(edges)
                     
-        return edges
+        return list(zip(rs.tolist(), cs.tolist()))
+        
+    def distances(self, locs1, locs2):
+        """Distance between every pair of locations (as ants.distance),
+        one row per loc in locs1
+        """
+        locs1 = np.asarray(locs1, dtype=np.int32).reshape(-1, 2)
+        locs2 = np.asarray(locs2, dtype=np.int32).reshape(-1, 2)
+        
+        dr = np.abs(locs1[:, None, 0] - locs2[None, :, 0])
+        dc = np.abs(locs1[:, None, 1] - locs2[None, :, 1])
+        
+        return np.minimum(dr, nrows - dr) + np.minimum(dc, ncols - dc)
         
     def combat_map(self, mmap, my_ants, enemy_ants, ants):
         """Set locs on map related to combat
@@ -285,111 +549,58 @@ class IForOneWelcomeOurNewInsectOverlords:
         is sure to be killed.
         """
         kill_radius = 2
-        die_locs = []
         
         # enemies influence each possible square they could attack the next turn
-        for loc in enemy_ants:
-            move_locs = self.locs_within(loc, 1)
-            enemy_moves = set()
-            for move_loc in move_locs:
-                enemy_moves.update(self.locs_within(move_loc, kill_radius, true_distance=True))
-                
-            die_locs.extend(enemy_moves)
-
-        for r, c in die_locs:
-            mmap[r][c] -= 150
+        # (every attack offset from every tile they can move to, each counted once)
+        moves = self.diamond_offsets[(1, False)]
+        attacks = self.diamond_offsets[(kill_radius, True)]
+        enemy_reach = np.unique((moves[:, :, None] + attacks[:, None, :]).reshape(2, -1), axis=1)
+        
+        die_count = self.count_within(enemy_ants, enemy_reach)
+        mmap -= 150 * die_count
             
         # use only ants that are within reasonable distance of enemies (move + attack + enemy move = 1 + 2 + 1 = 4)
-        my_eligible_ants = [a for a in my_ants if any([ants.distance(a, e) <= (kill_radius + 2) for e in enemy_ants])]
-            
-        attack_locs = []
+        eligible = (self.distances(my_ants, enemy_ants) <= (kill_radius + 2)).any(axis=1)
+        my_eligible_ants = my_ants[eligible]
             
         # influence only one tile away, unless touching another ant
-        for loc in my_eligible_ants:
-            ants_touching = any([ants.distance(loc, a) == 1 for a in my_eligible_ants])
-            ally_moves = self.locs_within(loc, 1, true_distance=ants_touching)
-            attack_locs.extend(ally_moves)
+        touching = (self.distances(my_eligible_ants, my_eligible_ants) == 1).any(axis=1)
+        attack_count = 0
+        for ants_touching in (False, True):
+            group = my_eligible_ants[touching == ants_touching]
+            attack_count = attack_count + self.count_within(group, self.diamond_offsets[(1, ants_touching)])
             
-        for loc in attack_locs:
-            if loc in die_locs:
-                r, c = loc
-                mmap[r][c] += 100
+        mmap += 100 * attack_count * (die_count > 0)
             
         return mmap
         
     def hill_defense(self, enemy_ants, ants, standoff=7):
         """Determine whether or not hill needs defending
         """
-        if not ants.visible(self.my_hill) or any([ants.distance(e, self.my_hill) <= standoff for e in enemy_ants]):
-            return [((self.my_hill), 50)]
+        if not ants.visible(self.my_hill) or (self.distances(enemy_ants, [self.my_hill]) <= standoff).any():
+            return [((self.my_hill), 50, MY_HILL)]
         else:
             return []
             
     def issue_orders(self, my_ants, ants, mmap):
-        """Loop through queue of ants, removing them if they have a valid space to move into.
+        """Issue the orders chosen by order_ants
         """
-        prev_destinations = set()
+        moves, issued = order_ants(mmap.reshape(-1), pack(my_ants[:, 0], my_ants[:, 1]), nrows, ncols)
         
-        level = 0
-        turns_without_order = 0 
-    
-        while my_ants:
-            loc = my_ants.pop(0)
-
-            # look for marker in queue, if so the following ants will choose their next best spot
-            # also check if too many turns have passed without issuing an order (this typically
-            # happens if ants want to move into each other's space)
-            if loc == None or turns_without_order >= len(my_ants) + 1:
-                level += 1
-                if level > 4:
-                    break
-                else:
-                    continue
-            
-            # add current loc to possible directions
-            directions = ['n', 's', 'e', 'w']
-            surrounding = [ants.destination(loc, d) for d in directions] + [loc]
-            directions += ['stay']
-            
-            # sort by best score
-            influences = [mmap[r][c] for r, c in surrounding]
-            max_idx = [i for _, i in sorted(zip(influences, range(len(influences))), reverse=True)][level]
-            destination = directions[max_idx]
-
-            # highest influence is current spot
-            if destination == 'stay':
-                prev_destinations.add(loc)
-                continue
-            
-            move_loc = surrounding[max_idx]
-            
-            # if moving into a square where another ant currently is, move to back of queue
-            if move_loc in my_ants:
-                my_ants.append(loc)
-                turns_without_order += 1
-                continue
-            
-            # trying to move into a space another ant has already chosen, append marker to queue
-            elif move_loc in prev_destinations:
-                if not None in my_ants:
-                    my_ants.append(None)
-                my_ants.append(loc)
-                continue
-                
-            # go!
-            else:
-                prev_destinations.add(move_loc)
-                turns_without_order = 0
-                ants.issue_order((loc, destination))
+        for i in issued:
+            ants.issue_order((tuple(my_ants[i].tolist()), order_directions[moves[i]]))
 
     def do_turn(self, ants):
         """Baked in turn function
         """
         self.update_visibility(ants)
        
-        amap = ants.map
+        amap = self.amap
+        amap[...] = ants.map
         food = ants.food()
-        my_ants = ants.my_ants()
+        
+        # ant locations as (N, 2) arrays, used as is by every helper below
+        my_ants = np.array(ants.my_ants(), dtype=np.int32).reshape(-1, 2)
         
         # add hills if not already added
         if not self.my_hill:
@@ -403,7 +614,7 @@ class IForOneWelcomeOurNewInsectOverlords:
         if not self.enemy_hill and ants.enemy_hills():
             self.enemy_hill = ants.enemy_hills()[0][0]
         
-        enemy_ants = [a[0] for a in ants.enemy_ants()]
+        enemy_ants = np.array([a[0] for a in ants.enemy_ants()], dtype=np.int32).reshape(-1, 2)
         
         # add/remove waves if there are enough ants
         if len(my_ants) >= 10:
@@ -414,10 +625,11 @@ class IForOneWelcomeOurNewInsectOverlords:
             self.waves = []
         
         # influence map (zeros)
-        imap = self.map_zeros(amap)
+        imap = self.imap
+        imap.fill(0)
 
         # create spots which stop propagation, such as water
-        self.set_stop_locs(amap)
+        np.take(stop_propagation_lut, amap, out=self.stop_mask)
 
         # add custom locs to map for influencing
         amap = self.add_to_map(amap, my_ants, ALLY_ANT)
@@ -434,29 +646,23 @@ class IForOneWelcomeOurNewInsectOverlords:
         # waves
         for wave in self.waves:
             wave.move(self.wave_dir)    
-            for i, loc in enumerate(wave.locs):
-                ilocs.append((loc, influence_values[WAVE]))
+            for loc in wave.locs.tolist():
+                ilocs.append((tuple(loc), influence_values[WAVE], WAVE))
 
         # add vision/edge influencers
-        ilocs += [(loc, NOT_VISIBLE) for loc in self.edge_locs(my_ants, ants)]
+        ilocs += [(loc, NOT_VISIBLE, NOT_VISIBLE) for loc in self.edge_locs(my_ants, ants)]
         
         # check if hill needs defending
         ilocs += self.hill_defense(enemy_ants, ants)
         
-        # influence list of lists
-        influence = self.map_influence(amap, ilocs, my_ants)
-        
         # add all influencers to map of zeros
-        mmap = self.add_influence(imap, influence)
+        mmap = self.map_influence(imap, amap, ilocs, my_ants)
         
         # prevent ants from moving to where they will die
         mmap = self.combat_map(mmap, my_ants, enemy_ants, ants)
         
         # food/water tiles are blocking, so prevent movement to them
-        for r, row in enumerate(amap):
-            for c, tile in enumerate(row):
-                if tile in blocked:
-                    mmap[r][c] = -10000
+        mmap[blocked_lut[amap]] = -10000
                     
         self.issue_orders(my_ants, ants, mmap)
        